@@ -3,22 +3,43 @@ import joblib
 import numpy as np
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import json
+import hmac
+from drift_monitor import DriftMonitor
+from input_schema import FEATURE_SCHEMA, schema_bounds, validate_inputs, describe_errors
 
 # GitHub/Streamlit uyumlu dosya yolları
 current_dir = os.path.dirname(os.path.abspath(__file__))
 csv_path = os.path.join(current_dir, 'heart_disease_feature.csv')
 csv_path_first= os.path.join(current_dir, 'heart_disease.csv')
 model_path = os.path.join(current_dir, 'heart_pipeline.joblib')
+drift_baseline_path = os.path.join(current_dir, 'heart_drift_baseline.joblib')
+metrics_path = os.path.join(current_dir, 'heart_metrics.json')
 
-# CSV dosyasını güvenli şekilde yükle
-try:
-    df = pd.read_csv(csv_path)
-    df_first=pd.read_csv(csv_path_first)
-except FileNotFoundError:
-    st.error(f"CSV dosyası bulunamadı: {csv_path}")
-    st.stop()
+# Eğitim veriseti sırasına uygun temel özellikler
+FEATURE_COLUMNS = list(FEATURE_SCHEMA)
+
+# CSV dosyaları ve matplotlib/seaborn yalnızca ihtiyaç duyan sayfa açıldığında yüklenir
+@st.cache_data
+def load_datasets():
+    return pd.read_csv(csv_path), pd.read_csv(csv_path_first)
+
+# Eğitim sırasında hesaplanıp model ile birlikte kaydedilen test metrikleri
+@st.cache_data
+def load_metrics():
+    try:
+        with open(metrics_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def format_metric(metrics, name, percent=False):
+    if metrics is None or name not in metrics["metrics"]:
+        return "—"
+    m = metrics["metrics"][name]
+    if percent:
+        return f"%{m['value'] * 100:.1f} [%{m['ci_low'] * 100:.1f}, %{m['ci_high'] * 100:.1f}]"
+    return f"{m['value']:.3f} [{m['ci_low']:.3f}, {m['ci_high']:.3f}]"
 
 def categorize_triglyceride(level):
     try:
@@ -37,14 +58,7 @@ def categorize_triglyceride(level):
 def add_ratios(X):
     # DataFrame'e dönüştürme
     if isinstance(X, np.ndarray):
-        X = pd.DataFrame(X, columns=[
-            'Age', 'Gender', 'Blood Pressure', 'Cholesterol Level', 'Exercise Habits', 
-            'Smoking', 'Family Heart Disease', 'Diabetes', 'BMI', 
-            'High Blood Pressure', 'Low HDL Cholesterol', 'High LDL Cholesterol', 
-            'Alcohol Consumption', 'Stress Level', 'Sleep Hours', 
-            'Sugar Consumption', 'Triglyceride Level', 'Fasting Blood Sugar', 
-            'CRP Level', 'Homocysteine Level'
-        ])
+        X = pd.DataFrame(X, columns=FEATURE_COLUMNS)
     
     # Triglyceride seviyesini kategorize et
     X['Ves_Hardness'] = X['Triglyceride Level'].apply(categorize_triglyceride)
@@ -81,6 +95,9 @@ def add_ratios(X):
 
 # Görselleştirme fonksiyonları
 def plot_categorical_distributions(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     try:
         cat_cols = df.select_dtypes("object").columns
         if len(cat_cols) == 0:
@@ -98,6 +115,9 @@ def plot_categorical_distributions(df):
         st.error(f"📊 Kategorik değişken görselleştirme hatası: {str(e)}")
 
 def plot_numerical_distributions(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     try:
         num_cols = df.select_dtypes(include=["number"]).columns
         if len(num_cols) == 0:
@@ -123,6 +143,48 @@ def plot_numerical_distributions(df):
     except Exception as e:
         st.error(f"📈 Sayısal değişken görselleştirme hatası: {str(e)}")
 
+# Sapma izleyicisi (tüm oturumlar arasında tek örnek)
+@st.cache_resource
+def _load_drift_monitor():
+    return DriftMonitor(joblib.load(drift_baseline_path))
+
+def load_drift_monitor():
+    # Referans dosyası henüz oluşturulmadıysa izleme kapalıdır; diğer hatalar bildirilir ve
+    # önbelleğe alınmaz (st.cache_resource istisnaları saklamaz), bir sonraki çalıştırmada yeniden denenir
+    if not os.path.exists(drift_baseline_path):
+        return None
+    try:
+        return _load_drift_monitor()
+    except Exception as e:
+        st.warning(f"⚠️ Sapma izleyicisi yüklenemedi: {str(e)}")
+        return None
+
+# Ağaç yolu katkı matrisi model başına bir kez oluşturulur ve tüm tahminlerde yeniden kullanılır
+@st.cache_resource
+def _load_explainer(_model):
+    # scipy.sparse yalnızca ilk açıklama istendiğinde yüklenir
+    from tree_explain import TreePathExplainer
+    return TreePathExplainer(_model)
+
+def load_explainer(model):
+    try:
+        return _load_explainer(model)
+    except Exception as e:
+        st.warning(f"⚠️ Tahmin açıklamaları hesaplanamadı: {str(e)}")
+        return None
+
+# Yönetim sayfası parolası (.streamlit/secrets.toml içindeki admin_password); tanımlı değilse sayfa gizlenir
+def get_admin_password():
+    try:
+        return st.secrets.get("admin_password")
+    except FileNotFoundError:
+        return None
+
+def is_admin_authenticated():
+    admin_password = get_admin_password()
+    entered = st.session_state.get("admin_password_input", "")
+    return bool(admin_password) and hmac.compare_digest(entered.encode("utf-8"), str(admin_password).encode("utf-8"))
+
 # Sayfa yapılandırması
 st.set_page_config(
     page_title="Kalp Hastalığı Tahmin Uygulaması",
@@ -135,10 +197,10 @@ with st.sidebar:
     st.title("📊 Navigasyon")
     
     # Ana sayfa seçimi
-    page = st.selectbox(
-        "Sayfa Seçin",
-        ["🏠 Ana Sayfa", "📈 SUNUM", "📋 Model Bilgileri", "ℹ️ Hakkında"]
-    )
+    pages = ["🏠 Ana Sayfa", "📈 SUNUM", "📋 Model Bilgileri", "ℹ️ Hakkında"]
+    if get_admin_password():
+        pages.append("🛠️ Yönetim")
+    page = st.selectbox("Sayfa Seçin", pages)
 
 # Ana sayfa
 if page == "🏠 Ana Sayfa":
@@ -168,28 +230,22 @@ if page == "🏠 Ana Sayfa":
             st.error(f"Model yüklenirken beklenmeyen bir hata oluştu: {str(e)}")
             return None
 
-    # Model yükleme denemesi
-    model = load_model()
-    if model is None:
-        st.error("Model yüklenemedi. Lütfen model dosyasının doğru konumda olduğundan emin olun.")
-        st.stop()
-
     # Kullanıcı girdileri
     st.subheader("Lütfen aşağıdaki bilgileri giriniz:")
 
     col1, col2 = st.columns(2)
 
     with col1:
-        age = st.number_input("Yaş", min_value=1, max_value=120, value=30)
+        age = st.number_input("Yaş", **schema_bounds("Age", int), value=30)
         sex = st.selectbox("Cinsiyet", ["Kadın", "Erkek"])
-        trestbps = st.number_input("Dinlenme Kan Basıncı (mm Hg)", min_value=90, max_value=200, value=110)
-        chol = st.number_input("Kolesterol (mg/dl) Seviyesini Giriniz:", min_value=100, max_value=600, value=200)
-        bmi = st.number_input("Vücut Kitle İndeksinizi Giriniz:", min_value=10.0, max_value=50.0, value=20.0)
-        fbs = st.number_input("Açlık Kan Şekeri Değerinizi Giriniz:", min_value=20, max_value=100, value=50)
-        sleep_hours=st.number_input("Rutin Uyku Saatinizi (Ortalama) Giriniz:", min_value=2.0, max_value=14.0, value=7.0)
-        trglycrde_lvl=st.number_input("Kan Tahlilinizde Saptanan Trigliserit Değerini Giriniz",min_value=100,max_value=400,value=250)
-        crp_lvl=st.number_input("Kan Tahlilinizde Saptanan Enfeksiyon (CRP) Değerinizi Giriniz",min_value=0.1,max_value=14.99,value=5.1)
-        hmocystesine_lvl=st.number_input("Kan Tahlilinizde Ölçülen Homosistein Seviyesi (Hcy) Değerini Giriniz",min_value=5.0,max_value=19.99,value=6.5)
+        trestbps = st.number_input("Dinlenme Kan Basıncı (mm Hg)", **schema_bounds("Blood Pressure", int), value=110)
+        chol = st.number_input("Kolesterol (mg/dl) Seviyesini Giriniz:", **schema_bounds("Cholesterol Level", int), value=200)
+        bmi = st.number_input("Vücut Kitle İndeksinizi Giriniz:", **schema_bounds("BMI"), value=20.0)
+        fbs = st.number_input("Açlık Kan Şekeri Değerinizi Giriniz:", **schema_bounds("Fasting Blood Sugar", int), value=50)
+        sleep_hours=st.number_input("Rutin Uyku Saatinizi (Ortalama) Giriniz:", **schema_bounds("Sleep Hours"), value=7.0)
+        trglycrde_lvl=st.number_input("Kan Tahlilinizde Saptanan Trigliserit Değerini Giriniz",**schema_bounds("Triglyceride Level", int), value=250)
+        crp_lvl=st.number_input("Kan Tahlilinizde Saptanan Enfeksiyon (CRP) Değerinizi Giriniz",**schema_bounds("CRP Level"), value=5.1)
+        hmocystesine_lvl=st.number_input("Kan Tahlilinizde Ölçülen Homosistein Seviyesi (Hcy) Değerini Giriniz",**schema_bounds("Homocysteine Level"), value=6.5)
 
     with col2:
         stress= st.selectbox("Stres Seviyeniz Nedir?",["Az","Orta","Çok"])
@@ -218,12 +274,13 @@ if page == "🏠 Ana Sayfa":
 
     # Tahmin butonu
     if st.button("🔍 Tahmin Et"):
+        # Model yükleme denemesi (sklearn ve model dosyası ilk tahminde yüklenir, form beklemeden çizilir)
+        model = load_model()
+        if model is None:
+            st.error("Model yüklenemedi. Lütfen model dosyasının doğru konumda olduğundan emin olun.")
+            st.stop()
+        
         try:
-            # Girdi değerlerini kontrol et
-            if not all([age, trestbps, chol, bmi, fbs, sleep_hours, trglycrde_lvl, crp_lvl, hmocystesine_lvl]):
-                st.error("❌ Lütfen tüm sayısal alanları doldurunuz.")
-                st.stop()
-            
             # Girdileri diziye dönüştürme (Eğitim veriseti sırasına uygun)
             input_data = np.array([[
                 float(age), 
@@ -248,6 +305,12 @@ if page == "🏠 Ana Sayfa":
                 float(hmocystesine_lvl)
             ]])
             
+            # Girdi değerlerini şemaya göre kontrol et
+            input_errors = validate_inputs(pd.DataFrame(input_data, columns=FEATURE_COLUMNS))
+            if input_errors.to_numpy().any():
+                st.error(f"❌ Geçersiz veya eksik alanlar: {describe_errors(input_errors).iloc[0]}")
+                st.stop()
+            
             # DataFrame'e dönüştürme ve oranları ekleme
             input_df = add_ratios(input_data)
             
@@ -260,6 +323,11 @@ if page == "🏠 Ana Sayfa":
             prediction = model.predict(input_df)
             probability = model.predict_proba(input_df)
             
+            # Girdiyi sapma izleyicisine kaydet
+            drift_monitor = load_drift_monitor()
+            if drift_monitor is not None:
+                drift_monitor.update(input_df)
+            
             # Risk seviyesine göre renkli gösterim
             risk_probability = probability[0][1] * 100
             
@@ -328,7 +396,23 @@ if page == "🏠 Ana Sayfa":
             with col2:
                 st.metric("Güvenli Olasılık", f"{100-risk_probability:.1f}%")
             with col3:
-                st.metric("Tahmin Güvenilirliği", "85%")
+                st.metric("Model ROC-AUC (Test)", format_metric(load_metrics(), "roc_auc"))
+            
+            # Tahmini etkileyen faktörler
+            explainer = load_explainer(model)
+            if explainer is not None:
+                contributions = explainer.explain(input_df).iloc[0]
+                top = contributions.reindex(contributions.abs().sort_values(ascending=False).index)[:10]
+                
+                st.subheader("🧭 Tahmini Etkileyen Faktörler")
+                st.write(f"Başlangıç (ortalama) risk: **{explainer.bias * 100:.1f}%**. "
+                         "Pozitif değerler riski artıran, negatif değerler azaltan etkileri gösterir.")
+                # Tablo |katkı| sırasını korur (st.bar_chart ekseni alfabetik sıralardı)
+                st.dataframe(
+                    pd.DataFrame({"Özellik": top.index, "Katkı (puan %)": (top.values * 100).round(2)}),
+                    hide_index=True,
+                    use_container_width=True
+                )
             
         except ValueError as ve:
             st.error(f"❌ Geçersiz değer hatası: {str(ve)}")
@@ -341,11 +425,86 @@ if page == "🏠 Ana Sayfa":
             st.write("🔍 Hata detayı:", str(e))
             st.info("💡 Lütfen tüm alanları doğru şekilde doldurduğunuzdan emin olun.")
 
+    # Toplu tahmin
+    st.subheader("📂 Toplu Tahmin (CSV)")
+    st.write("Sütunları eğitim verisindeki kodlanmış özelliklerle aynı olan bir CSV dosyası yükleyin.")
+    uploaded_file = st.file_uploader("CSV Dosyası Seçin", type="csv")
+    
+    if uploaded_file is not None:
+        # Skorlama, açıklamalar ve sapma kaydı yüklenen her dosya için yalnızca bir kez yapılır;
+        # sayfanın diğer yeniden çalıştırmalarında oturumda saklanan sonuç gösterilir
+        batch_state = st.session_state.get("batch_result")
+        if batch_state is None or batch_state["file_id"] != uploaded_file.file_id:
+            batch_state = {"file_id": uploaded_file.file_id, "error": None}
+            try:
+                batch_df = pd.read_csv(uploaded_file)
+                missing_cols = [col for col in FEATURE_COLUMNS if col not in batch_df.columns]
+                if missing_cols:
+                    raise ValueError(f"Eksik sütunlar: {', '.join(missing_cols)}")
+                
+                model = load_model()
+                if model is None:
+                    st.error("Model yüklenemedi. Lütfen model dosyasının doğru konumda olduğundan emin olun.")
+                    st.stop()
+                
+                # Geçersiz satırlar ayıklanır, yalnızca geçerli satırlar tahmin edilir
+                batch_errors = validate_inputs(batch_df)
+                valid_rows = ~batch_errors.any(axis=1)
+                
+                batch_input = add_ratios(batch_df.loc[valid_rows, FEATURE_COLUMNS].apply(pd.to_numeric).astype(float))
+                batch_proba = model.predict_proba(batch_input)[:, 1] if len(batch_input) else np.array([])
+                
+                drift_monitor = load_drift_monitor()
+                if drift_monitor is not None and len(batch_input):
+                    drift_monitor.update(batch_input)
+                
+                # Olasılık ve her özelliğin katkısı tek tabloda
+                result_df = batch_df.copy()
+                result_df["Hatalı Alanlar"] = describe_errors(batch_errors)
+                result_df.loc[valid_rows, "Risk Olasılığı"] = batch_proba
+                explainer = load_explainer(model)
+                if explainer is not None and len(batch_input):
+                    batch_contrib = explainer.explain(batch_input)
+                    result_df = pd.concat([result_df, batch_contrib.add_prefix("Katkı: ")], axis=1)
+                
+                batch_state.update(
+                    result_df=result_df,
+                    csv=result_df.to_csv(index=False).encode("utf-8"),
+                    n_valid=int(valid_rows.sum()),
+                    n_invalid=int((~valid_rows).sum())
+                )
+            except ValueError as ve:
+                batch_state["error"] = f"❌ {str(ve)}"
+            except Exception as e:
+                batch_state["error"] = f"❌ Toplu tahmin yapılırken bir hata oluştu: {str(e)}"
+            st.session_state["batch_result"] = batch_state
+        
+        if batch_state["error"] is not None:
+            st.error(batch_state["error"])
+        else:
+            if batch_state["n_invalid"]:
+                st.warning(f"⚠️ {batch_state['n_invalid']} kayıt geçersiz veya eksik değer içerdiği için tahmin edilmedi.")
+            st.write(f"**{batch_state['n_valid']} / {len(batch_state['result_df'])} kayıt tahmin edildi.**")
+            st.dataframe(batch_state["result_df"].head(100), use_container_width=True)
+            st.download_button(
+                "⬇️ Sonuçları İndir",
+                data=batch_state["csv"],
+                file_name="toplu_tahmin.csv",
+                mime="text/csv"
+            )
+
 # Sunum sayfası
 elif page == "📈 SUNUM":
     st.title("📈 SUNUM")
     st.write("Bu bölümde proje sürecinde yapılan analizler ve görselleştirmeler yer almaktadır.")
     
+    # CSV dosyasını güvenli şekilde yükle
+    try:
+        df, df_first = load_datasets()
+    except FileNotFoundError:
+        st.error(f"CSV dosyası bulunamadı: {csv_path}")
+        st.stop()
+    
     # Sunum bölümleri
     presentation_section = st.selectbox(
         "Sunum Bölümü Seçin",
@@ -420,20 +579,26 @@ elif page == "📈 SUNUM":
         if performance_option == "📊 Metrikler":
             col1, col2 = st.columns(2)
             
+            metrics = load_metrics()
+            
             with col1:
                 st.subheader("📊 Performans Metrikleri")
-                st.metric("Doğruluk (Accuracy)", "0.894 ± 0.004")
-                st.metric("F1 Skoru", "0.883 ± 0.004")
-                st.metric("Recall", "0.796 ± 0.006")
-                st.metric("Precision", "0.991 ± 0.005")
-                st.metric("ROC-AUC", "0.947 ± 0.005")
+                if metrics is None:
+                    st.info("💡 Metrik dosyası bulunamadı. Oluşturmak için `python model_pred.py` komutunu çalıştırın.")
+                st.metric("Doğruluk (Accuracy)", format_metric(metrics, "accuracy"))
+                st.metric("F1 Skoru", format_metric(metrics, "f1"))
+                st.metric("Recall", format_metric(metrics, "recall"))
+                st.metric("Precision", format_metric(metrics, "precision"))
+                st.metric("ROC-AUC", format_metric(metrics, "roc_auc"))
             
             with col2:
                 st.subheader("🔧 Model Detayları")
                 st.write("**Algoritma:** Random Forest Classifier")
                 st.write("**Veri Dengesizliği:** SMOTE ile düzeltildi")
                 st.write("**Özellik Sayısı:** 24 (20 temel + 4 türetilmiş)")
-                st.write("**Cross-Validation:** 5-Fold")
+                if metrics is not None:
+                    st.write(f"**Değerlendirme:** {metrics['n_test']} kayıtlık test seti, "
+                             f"{metrics['n_bootstrap']} bootstrap örneği, %{metrics['confidence'] * 100:.0f} güven aralığı")
                 
                 st.subheader("📈 İyileştirme Önerileri")
                 st.write("• Daha fazla veri toplama")
@@ -463,6 +628,9 @@ elif page == "📈 SUNUM":
                 st.write("**Hedef Değişken (Kalp Hastalığı) Analizi:**")
                 
                 if 'Heart Disease Status' in df.columns:
+                    import matplotlib.pyplot as plt
+                    import seaborn as sns
+                    
                     # Hedef değişken dağılımı
                     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
                     
@@ -516,7 +684,7 @@ elif page == "📈 SUNUM":
                 st.write("5. Açlık Kan Şekeri")
                 
                 st.write("**Model Avantajları:**")
-                st.write("• Yüksek doğruluk (%89.4)")
+                st.write(f"• Test doğruluğu ({format_metric(load_metrics(), 'accuracy', percent=True)})")
                 st.write("• Overfitting'e karşı dirençli")
                 st.write("• Özellik önemini belirleme")
                 st.write("• Kategorik ve sayısal verilerle çalışabilir")
@@ -580,13 +748,13 @@ elif page == "ℹ️ Hakkında":
     
     st.subheader("📋 Önemli Bilgilendirme")
     
-    st.markdown("""
+    st.markdown(f"""
     ⚠️ **Uyarı**: Bu uygulama sadece tahmin amaçlıdır ve tıbbi bir teşhis aracı değildir. 
     Herhangi bir sağlık sorununuz için mutlaka bir sağlık uzmanına başvurunuz.
 
     🔬 **Model Bilgileri**:
     - Model: Random Forest Classifier
-    - Doğruluk: %71.6
+    - Doğruluk: {format_metric(load_metrics(), "accuracy", percent=True)}
     - Veri Dengesizliği: SMOTE ile düzeltildi
     - Özellik Sayısı: 24 (20 temel + 4 türetilmiş)
 
@@ -598,4 +766,59 @@ elif page == "ℹ️ Hakkında":
     
     st.subheader("👨‍💻 Geliştirici")
     st.write("Bu proje eğitim amaçlı geliştirilmiştir.")
-    st.write("Teknolojiler: Python, Streamlit, Scikit-learn, Pandas, NumPy") 
\ No newline at end of file
+    st.write("Teknolojiler: Python, Streamlit, Scikit-learn, Pandas, NumPy")
+
+# Yönetim sayfası
+elif page == "🛠️ Yönetim":
+    st.title("🛠️ Yönetim")
+    
+    # Parola doğrulanmadan sayfa içeriği gösterilmez
+    st.text_input("Yönetici Parolası", type="password", key="admin_password_input")
+    if not is_admin_authenticated():
+        if st.session_state.get("admin_password_input"):
+            st.error("❌ Parola hatalı.")
+        st.stop()
+    
+    st.subheader("📡 Girdi Sapma İzleme")
+    st.write("Tahmin formundan gelen girdiler, eğitim verisinin dağılımıyla PSI ve KS istatistikleri üzerinden karşılaştırılır.")
+    
+    drift_monitor = load_drift_monitor()
+    if drift_monitor is None:
+        st.error(f"Sapma referans dosyası bulunamadı: {drift_baseline_path}")
+        st.info("💡 Referansı oluşturmak için `python model_pred.py` komutunu çalıştırın.")
+        st.stop()
+    
+    report, n_observed = drift_monitor.report()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Gözlenen Tahmin", n_observed)
+    with col2:
+        st.metric("Uyarı (PSI ≥ 0.1)", int((report["status"] == "warn").sum()))
+    with col3:
+        st.metric("Alarm (PSI ≥ 0.25)", int((report["status"] == "alert").sum()))
+    
+    if n_observed == 0:
+        st.info("📊 Henüz tahmin yapılmadı, sapma hesaplanamıyor.")
+    else:
+        if n_observed < 100:
+            st.caption("⚠️ Gözlem sayısı az olduğunda PSI/KS değerleri yüksek çıkabilir, yorumlarken dikkatli olun.")
+        st.dataframe(
+            report.sort_values("psi", ascending=False).reset_index(drop=True),
+            use_container_width=True
+        )
+    
+    snapshot = drift_monitor.snapshot()
+    with st.expander("🧾 JSON Anlık Görüntü"):
+        st.json(snapshot)
+    st.download_button(
+        "⬇️ JSON Olarak İndir",
+        data=json.dumps(snapshot, ensure_ascii=False, indent=2),
+        file_name="drift_snapshot.json",
+        mime="application/json"
+    )
+    
+    if st.button("🔄 Sayaçları Sıfırla"):
+        if is_admin_authenticated():
+            drift_monitor.reset()
+        st.rerun()
@@ -0,0 +1,125 @@
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Özellik başına sabit kova sayısı (eğitim verisinin kantillerinden)
+N_BINS = 10
+# Boş kovalarda log(0) oluşmaması için yumuşatma payı
+EPS = 1e-4
+# PSI eşikleri: < 0.1 stabil, 0.1-0.25 orta, > 0.25 yüksek sapma
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+# Bu satır sayısına kadar kovalar tek bir yayınlanmış (broadcast) karşılaştırmayla bulunur
+SMALL_BATCH_ROWS = 256
+
+
+def _bin_counts(X, features, inner_edges):
+    # Eksik değerler en sondaki ayrı kovaya düşer
+    n_features, n_slots = inner_edges.shape[0], inner_edges.shape[1] + 2
+    if not isinstance(X, pd.DataFrame):
+        X = np.asarray(X, dtype=float).reshape(-1, n_features)
+
+    if len(X) <= SMALL_BATCH_ROWS:
+        # Tekil istekler: tek vektörel karşılaştırma (ara dizi en fazla SMALL_BATCH_ROWS x özellik x kova)
+        if isinstance(X, pd.DataFrame):
+            X = (X if list(X.columns) == features else X[features]).to_numpy(dtype=float)
+        idx = (X[:, :, None] >= inner_edges[None, :, :]).sum(axis=2)
+        idx[np.isnan(X)] = n_slots - 1
+        flat = (idx + np.arange(n_features) * n_slots).ravel()
+        return np.bincount(flat, minlength=n_features * n_slots).reshape(n_features, n_slots)
+
+    # Büyük partiler: özellik bazında ikili arama, ek bellek tek sütun kadar
+    counts = np.zeros((n_features, n_slots), dtype=np.int64)
+    for j, name in enumerate(features):
+        column = X[name].to_numpy(dtype=float) if isinstance(X, pd.DataFrame) else X[:, j]
+        idx = np.searchsorted(inner_edges[j], column, side="right")
+        idx[np.isnan(column)] = n_slots - 1
+        counts[j] = np.bincount(idx, minlength=n_slots)
+    return counts
+
+
+# Eğitim verisinden referans dağılımı oluşturma
+def build_drift_baseline(X, n_bins=N_BINS):
+    X = pd.DataFrame(X)
+    features = list(X.columns)
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+    inner_edges = np.nanquantile(X.to_numpy(dtype=float), quantiles, axis=0).T
+    return {
+        "features": features,
+        "inner_edges": inner_edges,
+        "counts": _bin_counts(X, features, inner_edges),
+    }
+
+
+def _psi(base_prob, live_prob):
+    p = np.clip(base_prob, EPS, None)
+    q = np.clip(live_prob, EPS, None)
+    return ((q - p) * np.log(q / p)).sum(axis=1)
+
+
+def _ks(base_prob, live_prob):
+    # Kovalanmış dağılımlar üzerinden yaklaşık KS istatistiği
+    return np.abs(np.cumsum(base_prob, axis=1) - np.cumsum(live_prob, axis=1)).max(axis=1)
+
+
+def _status(psi):
+    if psi >= PSI_ALERT:
+        return "alert"
+    elif psi >= PSI_WARN:
+        return "warn"
+    return "ok"
+
+
+class DriftMonitor:
+    """Canlı girdileri sabit boyutlu histogramlarda biriktirip eğitim referansıyla karşılaştırır.
+
+    Bellek kullanımı trafikten bağımsızdır: özellik başına yalnızca N_BINS + 1 sayaç tutulur.
+    """
+
+    def __init__(self, baseline):
+        self.features = list(baseline["features"])
+        self._inner_edges = np.asarray(baseline["inner_edges"], dtype=float)
+        base_counts = np.asarray(baseline["counts"], dtype=float)
+        self._base_prob = base_counts / base_counts.sum(axis=1, keepdims=True)
+        self._counts = np.zeros(base_counts.shape, dtype=np.int64)
+        self._lock = threading.Lock()
+        self.n_observed = 0
+
+    def update(self, X):
+        counts = _bin_counts(X, self.features, self._inner_edges)
+        with self._lock:
+            self._counts += counts
+            self.n_observed += int(counts[0].sum())
+
+    def reset(self):
+        with self._lock:
+            self._counts[:] = 0
+            self.n_observed = 0
+
+    def report(self):
+        with self._lock:
+            counts = self._counts.astype(float)
+            n_observed = self.n_observed
+        if n_observed == 0:
+            live_prob = np.zeros_like(counts)
+        else:
+            live_prob = counts / counts.sum(axis=1, keepdims=True)
+        psi = _psi(self._base_prob, live_prob)
+        ks = _ks(self._base_prob, live_prob)
+        report = pd.DataFrame({"feature": self.features, "psi": psi, "ks": ks})
+        report["status"] = [_status(v) for v in psi] if n_observed else "no_data"
+        return report, n_observed
+
+    def snapshot(self):
+        report, n_observed = self.report()
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "n_observed": int(n_observed),
+            "n_bins": int(self._inner_edges.shape[1] + 1),
+            "features": {
+                row.feature: {"psi": round(float(row.psi), 6), "ks": round(float(row.ks), 6), "status": row.status}
+                for row in report.itertuples(index=False)
+            },
+        }
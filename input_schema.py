@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Model girdilerinin tanımı (eğitim veriseti sırasına uygun).
+# Sayısal alanlar için kabul edilen aralık, kategorik alanlar için izin verilen kodlar.
+# "required": False olan alanlarda eksik değer hata sayılmaz.
+FEATURE_SCHEMA = {
+    "Age": {"min": 1, "max": 120},
+    "Gender": {"codes": [0, 1]},
+    "Blood Pressure": {"min": 90, "max": 200},
+    "Cholesterol Level": {"min": 100, "max": 600},
+    "Exercise Habits": {"codes": [1, 2, 3]},
+    "Smoking": {"codes": [0, 1]},
+    "Family Heart Disease": {"codes": [0, 1]},
+    "Diabetes": {"codes": [0, 1]},
+    "BMI": {"min": 10.0, "max": 50.0},
+    "High Blood Pressure": {"codes": [0, 1]},
+    "Low HDL Cholesterol": {"codes": [0, 1]},
+    "High LDL Cholesterol": {"codes": [0, 1]},
+    "Alcohol Consumption": {"codes": [0, 1, 2]},
+    "Stress Level": {"codes": [0, 1, 2]},
+    "Sleep Hours": {"min": 2.0, "max": 14.0},
+    "Sugar Consumption": {"codes": [0, 1, 2]},
+    "Triglyceride Level": {"min": 100, "max": 400},
+    "Fasting Blood Sugar": {"min": 20, "max": 300},
+    "CRP Level": {"min": 0.0, "max": 15.0},
+    "Homocysteine Level": {"min": 5.0, "max": 20.0},
+}
+
+
+def schema_bounds(name, cast=float):
+    # Form bileşenleri için min/max değerleri şemadan alınır
+    spec = FEATURE_SCHEMA[name]
+    return {"min_value": cast(spec["min"]), "max_value": cast(spec["max"])}
+
+
+def _compile_schema(schema):
+    names = list(schema)
+    lo = np.array([min(s["codes"]) if "codes" in s else s["min"] for s in schema.values()], dtype=float)
+    hi = np.array([max(s["codes"]) if "codes" in s else s["max"] for s in schema.values()], dtype=float)
+    required = np.array([s.get("required", True) for s in schema.values()])
+    cat_idx = np.array([i for i, s in enumerate(schema.values()) if "codes" in s], dtype=np.intp)
+    # Aralığı boşluklu kod listeleri (ör. [0, 2]) ayrıca np.isin ile kontrol edilir
+    gapped = [
+        (i, np.asarray(spec["codes"], dtype=float))
+        for i, spec in enumerate(schema.values())
+        if "codes" in spec and len(set(spec["codes"])) != hi[i] - lo[i] + 1
+    ]
+    return names, lo, hi, required, cat_idx, gapped
+
+
+_NAMES, _LO, _HI, _REQUIRED, _CAT_IDX, _GAPPED = _compile_schema(FEATURE_SCHEMA)
+
+
+def validate_inputs(X):
+    """Tüm satırları tek seferde doğrular ve (satır x özellik) hata maskesi döndürür.
+
+    İlk hatalı değerde durmaz; eksik sütunlar tamamen eksik değer olarak işaretlenir,
+    sayıya çevrilemeyen değerler de hata sayılır.
+    """
+    X = pd.DataFrame(X)
+    # Sütun bazlı yazım ve okuma için Fortran sıralı matris
+    values = np.full((len(X), len(_NAMES)), np.nan, order="F")
+    not_numeric = np.zeros(values.shape, dtype=bool, order="F")
+    for j, name in enumerate(_NAMES):
+        if name not in X.columns:
+            continue
+        col = X[name]
+        if pd.api.types.is_numeric_dtype(col):
+            values[:, j] = col.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            converted = pd.to_numeric(col, errors="coerce")
+            values[:, j] = converted.to_numpy(dtype=float, na_value=np.nan)
+            not_numeric[:, j] = converted.isna().to_numpy() & col.notna().to_numpy()
+
+    missing = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        # NaN karşılaştırmaları False döndüğünden eksik değerler burada hata sayılmaz
+        errors = (values < _LO) | (values > _HI)
+        cat = values[:, _CAT_IDX]
+        errors[:, _CAT_IDX] |= (cat - np.floor(cat)) > 0
+    for j, codes in _GAPPED:
+        errors[:, j] |= ~missing[:, j] & ~np.isin(values[:, j], codes)
+    errors |= (missing & _REQUIRED) | not_numeric
+
+    return pd.DataFrame(errors, columns=_NAMES, index=X.index)
+
+
+def describe_errors(errors):
+    # Yalnızca hatalı satırlar için "Özellik1, Özellik2" biçiminde açıklama
+    bad = errors[errors.any(axis=1)]
+    names = np.array(errors.columns)
+    return pd.Series([", ".join(names[row]) for row in bad.to_numpy()], index=bad.index, dtype=object)
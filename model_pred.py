@@ -1,25 +1,22 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, f1_score, recall_score, precision_score, roc_auc_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.impute import SimpleImputer, KNNImputer
-from imblearn.over_sampling import SMOTE
-from sklearn.model_selection import StratifiedKFold
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import FunctionTransformer
 import pandas as pd
-import joblib, os
+import joblib, os, json
+from drift_monitor import build_drift_baseline
 
-# Veri yükleme
+# Ağır bağımlılıklar (sklearn, imblearn, matplotlib) yalnızca kullanıldıkları fonksiyonlarda
+# içe aktarılır; böylece modül import edildiğinde (ör. add_ratios için) yan etki oluşmaz.
 current_dir = os.path.dirname(os.path.abspath(__file__))
 path = os.path.join(current_dir, "heart_disease.csv")
-df = pd.read_csv(path)
+
+# Veri yükleme
+def load_data():
+    return pd.read_csv(path)
 
 # Görselleştirme fonksiyonları
 def plot_categorical_distributions(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     cat_cols = df.select_dtypes("object").columns
     for col in cat_cols:
         plt.figure(figsize=(8, 4))
@@ -29,6 +26,9 @@ def plot_categorical_distributions(df):
         plt.show()
 
 def plot_numerical_distributions(df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     num_cols = df.select_dtypes(include=["number"]).columns
     for col in num_cols:
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 6))
@@ -48,6 +48,9 @@ def plot_numerical_distributions(df):
 
 # Veri ön işleme
 def preprocess_data(df):
+    from sklearn.impute import SimpleImputer, KNNImputer
+    from sklearn.preprocessing import LabelEncoder
+    
     df = df.copy()
     
     # Eksik veri doldurma
@@ -93,9 +96,74 @@ def add_ratios(X):
     X["Chol/Exe"] = X["Cholesterol Level"] / X["Exercise Habits"]
     return X
 
+# Bootstrap değerlendirme
+METRIC_NAMES = ["accuracy", "f1", "recall", "precision", "roc_auc"]
+
+def _bootstrap_metrics(y_true, y_pred, y_score, idx):
+    from scipy.stats import rankdata
+    
+    # idx: (B, n) indeks matrisi; her satır bir bootstrap örneği, tüm metrikler satır bazında vektörel
+    t, p, s = y_true[idx], y_pred[idx], y_score[idx]
+    tp = (t & p).sum(axis=1)
+    fp = (~t & p).sum(axis=1)
+    fn = (t & ~p).sum(axis=1)
+    n_pos = t.sum(axis=1)
+    n_neg = t.shape[1] - n_pos
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(n_pos > 0, tp / n_pos, 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+        # ROC-AUC: olasılık sıraları üzerinden Mann-Whitney U
+        pos_rank_sum = (rankdata(s, axis=1) * t).sum(axis=1)
+        roc_auc = (pos_rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+    
+    return np.column_stack([(t == p).mean(axis=1), f1, recall, precision, roc_auc])
+
+def evaluate_model(pipe, X_test, y_test, n_bootstrap=1000, confidence=0.95, n_jobs=-1, random_state=42):
+    from joblib import Parallel, delayed
+    
+    y_true = np.asarray(y_test).astype(bool)
+    y_pred = np.asarray(pipe.predict(X_test)).astype(bool)
+    y_score = pipe.predict_proba(X_test)[:, 1]
+    n = len(y_true)
+    
+    point = _bootstrap_metrics(y_true, y_pred, y_score, np.arange(n)[None, :])[0]
+    
+    # İndeks matrisi parçalara bölünüp çekirdeklere dağıtılır
+    rng = np.random.default_rng(random_state)
+    idx = rng.integers(0, n, size=(n_bootstrap, n))
+    n_chunks = min(n_bootstrap, joblib.cpu_count() * 4)
+    boot = np.vstack(Parallel(n_jobs=n_jobs)(
+        delayed(_bootstrap_metrics)(y_true, y_pred, y_score, chunk)
+        for chunk in np.array_split(idx, n_chunks)
+    ))
+    
+    alpha = (1 - confidence) / 2
+    low = np.nanquantile(boot, alpha, axis=0)
+    high = np.nanquantile(boot, 1 - alpha, axis=0)
+    std = np.nanstd(boot, axis=0)
+    
+    return {
+        "n_test": int(n),
+        "n_bootstrap": int(n_bootstrap),
+        "confidence": confidence,
+        "metrics": {
+            name: {"value": float(point[i]), "ci_low": float(low[i]), "ci_high": float(high[i]), "std": float(std[i])}
+            for i, name in enumerate(METRIC_NAMES)
+        },
+    }
+
 # Ana işlem
 def main():
-    # Veri ön işleme
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+    from imblearn.over_sampling import SMOTE
+    
+    # Veri yükleme ve ön işleme
+    df = load_data()
     df_processed = preprocess_data(df)
     
     # Görselleştirme
@@ -133,15 +201,22 @@ def main():
     model_save_path = os.path.join(current_dir, 'heart_pipeline.joblib')
     joblib.dump(pipe, model_save_path)
     print(f"✅ Pipeline başarıyla kaydedildi → {model_save_path}")
+
+    # Sapma izleme için referans dağılımı (SMOTE öncesi gerçek eğitim verisi)
+    baseline_save_path = os.path.join(current_dir, 'heart_drift_baseline.joblib')
+    joblib.dump(build_drift_baseline(add_ratios(X_train)), baseline_save_path)
+    print(f"✅ Sapma referansı kaydedildi → {baseline_save_path}")
       
-    # Model değerlendirme
-    y_pred = pipe.predict(X_test)
-    print("\nModel Performans Metrikleri:")
-    print(f"Accuracy: {accuracy_score(y_test, y_pred):.3f}")
-    print(f"F1 Score: {f1_score(y_test, y_pred):.3f}")
-    print(f"Recall: {recall_score(y_test, y_pred):.3f}")
-    print(f"Precision: {precision_score(y_test, y_pred):.3f}")
-    print(f"ROC-AUC: {roc_auc_score(y_test, y_pred):.3f}")
+    # Model değerlendirme (test seti üzerinde bootstrap güven aralıkları)
+    metrics = evaluate_model(pipe, X_test, y_test)
+    metrics_save_path = os.path.join(current_dir, 'heart_metrics.json')
+    with open(metrics_save_path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    print(f"✅ Model metrikleri kaydedildi → {metrics_save_path}")
+    
+    print(f"\nModel Performans Metrikleri (%{metrics['confidence'] * 100:.0f} GA, {metrics['n_bootstrap']} bootstrap):")
+    for name, m in metrics["metrics"].items():
+        print(f"{name}: {m['value']:.3f} [{m['ci_low']:.3f}, {m['ci_high']:.3f}]")
 
 if __name__ == "__main__":
     main()